@@ -0,0 +1,48 @@
+"""Time steps 2-3 (threshold + open) per backend on the sample scans.
+
+Run ``python bench_backends.py``. Both backends get the same blurred image and
+the same scratch buffers; the numba kernels are compiled before timing.
+"""
+import os
+import sys
+import time
+
+import cv2 # type: ignore
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication # type: ignore
+
+import finalrun
+from oct_preprocess import threshold_open
+
+SAMPLES = ["oct 1.jpg", "oct2.jpg", "oct 3.jpg"]
+
+
+def best_ms(fn, repeat=200):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main():
+    app = QApplication(sys.argv)  # noqa: F841  (OCTLesionAutoApp is a QWidget)
+    win = finalrun.OCTLesionAutoApp()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in SAMPLES:
+        img = cv2.imread(os.path.join(here, name), cv2.IMREAD_GRAYSCALE)
+        buf = win._scratch_for(img.shape)
+        blur = finalrun._blur(img).copy()
+        args = (blur, buf["rows"], buf["thresh"], buf["below"], buf["opened"])
+
+        threshold_open(*args)  # compile / load from cache
+        cv_ms = best_ms(lambda: win._threshold_open_cv2(blur, buf))
+        nb_ms = best_ms(lambda: threshold_open(*args))
+        print(f"{name:10s} {img.shape[0]}x{img.shape[1]}  opencv {cv_ms:6.2f} ms  numba {nb_ms:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
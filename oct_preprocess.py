@@ -0,0 +1,83 @@
+import numpy as np
+from numba import njit, prange  # type: ignore
+
+
+@njit(inline='always')
+def _row_sums(src, r, out):
+    """Horizontal (2r+1)-wide box sums with replicated borders, into ``out``."""
+    h, w = src.shape
+    for y in prange(h):
+        acc = np.int32(0)
+        for k in range(-r, r + 1):
+            acc += np.int32(src[y, min(max(k, 0), w - 1)])
+        for x in range(w):
+            out[y, x] = acc
+            acc += np.int32(src[y, min(x + r + 1, w - 1)]) - np.int32(src[y, max(x - r, 0)])
+
+
+@njit(inline='always')
+def _box_threshold(blur, r, c, rows, out):
+    """Mean-C inverse threshold: 255 where blur <= box_mean(blur) - c.
+
+    ``rows`` is int32 scratch for the horizontal sums. Each row band keeps a
+    running column sum of width w that slides down the image, so the
+    (2r+1)^2 mean costs O(1) per pixel.
+    """
+    h, w = blur.shape
+    _row_sums(blur, r, rows)
+    n = (2 * r + 1) * (2 * r + 1)
+    bands = 16
+    step = (h + bands - 1) // bands
+    for b in prange(bands):
+        y0 = b * step
+        y1 = min(y0 + step, h)
+        if y0 >= y1:
+            continue
+        col = np.zeros(w, np.int32)
+        for k in range(y0 - r, y0 + r + 1):
+            yy = min(max(k, 0), h - 1)
+            for x in range(w):
+                col[x] += rows[yy, x]
+        for y in range(y0, y1):
+            for x in range(w):
+                mean = (col[x] + n // 2) // n
+                out[y, x] = 255 if np.int32(blur[y, x]) <= mean - c else 0
+            add = min(y + r + 1, h - 1)
+            sub = max(y - r, 0)
+            for x in range(w):
+                col[x] += rows[add, x] - rows[sub, x]
+
+
+@njit(inline='always')
+def _morph_cross(src, erode, out):
+    """One erosion (min) or dilation (max) with the 3x3 ellipse (a cross).
+
+    Clamped taps give the same result as OpenCV ignoring outside pixels.
+    """
+    h, w = src.shape
+    for y in prange(h):
+        up = max(y - 1, 0)
+        dn = min(y + 1, h - 1)
+        for x in range(w):
+            v = src[y, x]
+            for u in (src[y, max(x - 1, 0)], src[y, min(x + 1, w - 1)], src[up, x], src[dn, x]):
+                v = min(v, u) if erode else max(v, u)
+            out[y, x] = v
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def threshold_open(blur, rows, thresh, tmp, out):
+    """Fused adaptive threshold + open of a blurred uint8 OCT B-scan, into ``out``.
+
+    Same result as adaptiveThreshold(MEAN_C, BINARY_INV, 35, 5) followed by
+    MORPH_OPEN with a 3x3 ellipse, iterations=2. ``rows`` (int32), ``thresh``
+    and ``tmp`` (uint8) are scratch of blur's shape. Returns ``out``, a uint8
+    {0, 255} mask.
+    """
+    _box_threshold(blur, 17, 5, rows, thresh)
+    # MORPH_OPEN, 3x3 ellipse, iterations=2: erode twice, then dilate twice
+    _morph_cross(thresh, True, tmp)
+    _morph_cross(tmp, True, thresh)
+    _morph_cross(thresh, False, tmp)
+    _morph_cross(tmp, False, out)
+    return out
@@ -5,10 +5,12 @@ from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QPushButton,
     QVBoxLayout, QWidget, QLabel
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
+from areautil import area_from_poly
+
 class LesionAreaApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -17,7 +19,9 @@ class LesionAreaApp(QMainWindow):
 
         self.image = None
         self.drawing = False
-        self.points = []
+        # Stroke points as a growable float32 (x, y) buffer; the first _n rows are live
+        self._pts = np.empty((4096, 2), np.float32)
+        self._n = 0
 
         self.pixel_spacing_mm = 0.006  # Example: 6 microns per pixel
 
@@ -27,6 +31,16 @@ class LesionAreaApp(QMainWindow):
         self.canvas = FigureCanvas(Figure())
         self.ax = self.canvas.figure.subplots()
 
+        # Persistent artists, updated in place rather than re-plotted
+        self._im = self.ax.imshow(np.zeros((2, 2), np.uint8), cmap='gray', visible=False)
+        self._line, = self.ax.plot([], [], 'r-', linewidth=2)
+
+        # Coalesce stroke redraws to ~30 Hz instead of one per mouse event
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(33)
+        self._redraw_timer.timeout.connect(self._do_redraw)
+
         self.load_btn = QPushButton("Load OCT Image")
         self.load_btn.clicked.connect(self.load_image)
 
@@ -57,17 +71,22 @@ class LesionAreaApp(QMainWindow):
             self.show_image()
 
     def show_image(self):
-        self.ax.clear()
         if self.image is not None:
-            self.ax.imshow(self.image, cmap='gray')
-        if self.points:
-            pts = np.array(self.points)
-            self.ax.plot(pts[:, 0], pts[:, 1], 'r-', linewidth=2)
+            h, w = self.image.shape
+            self._im.set_data(self.image)
+            self._im.set_extent((-0.5, w - 0.5, h - 0.5, -0.5))
+            self._im.autoscale()
+        self._im.set_visible(self.image is not None)
         self.ax.axis('off')
-        self.canvas.draw()
+        self._do_redraw()
+
+    def _do_redraw(self):
+        pts = self._pts[:self._n]
+        self._line.set_data(pts[:, 0], pts[:, 1])
+        self.canvas.draw_idle()
 
     def clear_points(self):
-        self.points = []
+        self._n = 0
         self.area_label.setText("Draw a lesion to calculate area.")
         self.show_image()
 
@@ -75,12 +94,17 @@ class LesionAreaApp(QMainWindow):
         if event.inaxes != self.ax or self.image is None:
             return
         self.drawing = True
-        self.points = [(event.xdata, event.ydata)]
+        self._pts[0] = (event.xdata, event.ydata)
+        self._n = 1
 
     def on_motion(self, event):
         if self.drawing and event.inaxes == self.ax:
-            self.points.append((event.xdata, event.ydata))
-            self.show_image()
+            if self._n == len(self._pts):
+                self._pts = np.concatenate([self._pts, np.empty_like(self._pts)])
+            self._pts[self._n] = (event.xdata, event.ydata)
+            self._n += 1
+            if not self._redraw_timer.isActive():
+                self._redraw_timer.start()
 
     def on_release(self, event):
         if not self.drawing:
@@ -89,14 +113,10 @@ class LesionAreaApp(QMainWindow):
         self.calculate_area()
 
     def calculate_area(self):
-        if len(self.points) < 3:
+        if self._n < 3:
             self.area_label.setText("Draw a closed region.")
             return
-        pts = np.array(self.points, dtype=np.int32)
-        mask = np.zeros(self.image.shape, dtype=np.uint8)
-        cv2.fillPoly(mask, [pts], 1)
-        pixel_area = np.sum(mask)
-        mm2_area = pixel_area * (self.pixel_spacing_mm ** 2)
+        mm2_area = area_from_poly(self._pts[:self._n], self.pixel_spacing_mm)
         self.area_label.setText(f"Lesion Area: {mm2_area:.4f} mm²")
         self.show_image()
 
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    pytest.importorskip("PyQt5")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication  # type: ignore
+
+    # Held by the session fixture, so the app outlives every widget
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def app(qapp):
+    pytest.importorskip("cv2")
+    import finalrun
+
+    return finalrun.OCTLesionAutoApp()
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import areautil
+from areautil import area_from_mask, area_from_poly
+
+SQUARE = [(0, 0), (10, 0), (10, 10), (0, 10)]
+
+
+def test_poly_square():
+    assert area_from_poly(SQUARE, 1.0) == pytest.approx(100.0)
+    assert area_from_poly(SQUARE, 0.5) == pytest.approx(25.0)
+
+
+def test_poly_winding_direction_does_not_matter():
+    assert area_from_poly(SQUARE[::-1], 1.0) == pytest.approx(100.0)
+
+
+def test_poly_figure_eight_lobes_cancel():
+    # Two lobes of area 1, traced in opposite directions: documented limitation
+    assert area_from_poly([(0, 0), (2, 2), (2, 0), (0, 2)], 1.0) == pytest.approx(0.0)
+
+
+def _packed_mask(shape=(13, 7)):  # 91 px, not a multiple of 8
+    rng = np.random.default_rng(0)
+    mask = np.where(rng.random(shape) < 0.4, np.uint8(255), np.uint8(0))
+    return mask, np.packbits(mask)
+
+
+def test_mask_matches_count_nonzero():
+    mask, packed = _packed_mask()
+    assert area_from_mask(packed, 0.5) == pytest.approx(np.count_nonzero(mask) * 0.25)
+
+
+def test_mask_popcount_fallback(monkeypatch):
+    mask, packed = _packed_mask()
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert not hasattr(areautil.np, "bitwise_count")
+    assert area_from_mask(packed, 0.5) == pytest.approx(np.count_nonzero(mask) * 0.25)
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("numba")
+pytest.importorskip("PyQt5")
+
+import finalrun  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = ["oct 1.jpg", "oct2.jpg", "oct 3.jpg"]
+
+
+def _mask(app, img, monkeypatch, threshold_open):
+    monkeypatch.setattr(finalrun, "threshold_open", threshold_open)
+    return app.lesion_mask(img).copy()
+
+
+def _all_backends(app, img, monkeypatch):
+    from oct_preprocess import threshold_open
+
+    return {
+        "cv2": _mask(app, img, monkeypatch, None),
+        "numba": _mask(app, img, monkeypatch, threshold_open),
+    }
+
+
+@pytest.mark.parametrize("name", SAMPLES)
+def test_backends_agree_on_samples(app, monkeypatch, name):
+    img = cv2.imread(os.path.join(ROOT, name), cv2.IMREAD_GRAYSCALE)
+    masks = _all_backends(app, img, monkeypatch)
+    assert masks["cv2"].any()
+    for key, mask in masks.items():
+        np.testing.assert_array_equal(mask, masks["cv2"], err_msg=key)
+
+
+def test_backends_agree_on_512(app, monkeypatch):
+    img = cv2.imread(os.path.join(ROOT, "oct2.jpg"), cv2.IMREAD_GRAYSCALE)
+    img = cv2.resize(img, (512, 512), interpolation=cv2.INTER_AREA)
+    masks = _all_backends(app, img, monkeypatch)
+    for key, mask in masks.items():
+        np.testing.assert_array_equal(mask, masks["cv2"], err_msg=key)
+
+
+def test_numba_calls_hold_the_kernel_lock(app, monkeypatch):
+    from oct_preprocess import threshold_open
+
+    def locked_threshold_open(*args):
+        assert finalrun._KERNEL_LOCK.locked()
+        return threshold_open(*args)
+
+    img = cv2.imread(os.path.join(ROOT, "oct2.jpg"), cv2.IMREAD_GRAYSCALE)
+    _mask(app, img, monkeypatch, locked_threshold_open)
+    assert not finalrun._KERNEL_LOCK.locked()
+
+
+def test_guided_blur_falls_back_to_bilateral(monkeypatch):
+    img = cv2.imread(os.path.join(ROOT, "oct2.jpg"), cv2.IMREAD_GRAYSCALE)
+    monkeypatch.delattr(cv2, "ximgproc", raising=False)
+    np.testing.assert_array_equal(finalrun._blur(img, "guided"), cv2.bilateralFilter(img, 9, 75, 75))
+
+
+def _original_mask(img):
+    # Steps 1-5 as first written: per-contour filtering and a ROI rectangle
+    blur = cv2.bilateralFilter(img, 9, 75, 75)
+    thresh = cv2.adaptiveThreshold(blur, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                   cv2.THRESH_BINARY_INV, 35, 5)
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    opened = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=2)
+    mask_clean = np.zeros_like(opened)
+    contours, _ = cv2.findContours(opened, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    for cnt in contours:
+        if 100 < cv2.contourArea(cnt) < 3000:
+            cv2.drawContours(mask_clean, [cnt], -1, 255, -1)
+    h, w = img.shape
+    roi_mask = np.zeros_like(img)
+    cv2.rectangle(roi_mask, (0, int(h * 0.2)), (w, int(h * 0.85)), 255, -1)
+    return cv2.bitwise_and(mask_clean, roi_mask)
+
+
+@pytest.mark.parametrize("name", SAMPLES)
+def test_mask_matches_original_pipeline(app, monkeypatch, name):
+    img = cv2.imread(os.path.join(ROOT, name), cv2.IMREAD_GRAYSCALE)
+    expected = _original_mask(img)
+    for key, mask in _all_backends(app, img, monkeypatch).items():
+        np.testing.assert_array_equal(mask, expected, err_msg=key)
@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("numba")
+
+from oct_preprocess import threshold_open  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(blur):
+    rows = np.empty(blur.shape, np.int32)
+    thresh, tmp, out = (np.empty_like(blur) for _ in range(3))
+    assert threshold_open(blur, rows, thresh, tmp, out) is out
+    return out
+
+
+def _reference(blur):
+    thresh = cv2.adaptiveThreshold(blur, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                   cv2.THRESH_BINARY_INV, 35, 5)
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    return cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=2)
+
+
+@pytest.mark.parametrize("shape", [(496, 512), (512, 512), (497, 768), (885, 1280), (15, 9), (1, 40)])
+def test_matches_opencv(shape):
+    rng = np.random.default_rng(shape[0] * shape[1])
+    # Smooth background plus speckle, so the threshold fires in blobs
+    base = np.linspace(40, 200, shape[0] * shape[1]).reshape(shape)
+    blur = np.clip(base + rng.normal(0, 25, shape), 0, 255).astype(np.uint8)
+    np.testing.assert_array_equal(_run(blur), _reference(blur))
+
+
+def test_matches_opencv_on_sample():
+    img = cv2.imread(os.path.join(ROOT, "oct2.jpg"), cv2.IMREAD_GRAYSCALE)
+    blur = cv2.bilateralFilter(img, 9, 75, 75)
+    opened = _run(blur)
+    assert opened.any()
+    np.testing.assert_array_equal(opened, _reference(blur))
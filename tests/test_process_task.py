@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("PyQt5")
+
+import finalrun  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(app, file_path):
+    results = {}
+    task = finalrun._ProcessTask(app, file_path)
+    task.signals.finished.connect(lambda *args: results.setdefault("finished", args))
+    task.signals.failed.connect(lambda msg: results.setdefault("failed", msg))
+    task.run()  # synchronously, on this thread
+    return results
+
+
+def test_unreadable_file_reports_failure(app):
+    assert _run(app, os.path.join(ROOT, "missing.png")) == {"failed": "Failed to load image."}
+
+
+def test_exception_in_analysis_reports_failure(app, monkeypatch):
+    def boom(img):
+        raise MemoryError("out of memory")
+
+    monkeypatch.setattr(app, "process_image", boom)
+    results = _run(app, os.path.join(ROOT, "oct2.jpg"))
+    assert results == {"failed": "Analysis failed: out of memory"}
+
+
+def test_failure_re_enables_load(app):
+    app.btn_load.setEnabled(False)
+    app._on_load_failed("Analysis failed: out of memory")
+    assert app.btn_load.isEnabled()
+    assert app.label_info.text() == "❌ Analysis failed: out of memory"